@@ -9,11 +9,14 @@ app.register_worker(notifications.worker)
 
 
 async def main():
-    for i in range(1000, 2000):
-        await notifications.send_sms.send(
+    messages = [
+        notifications.send_sms.message(
             phone=f"012345{i}",
             message="Important Message",
         )
+        for i in range(1000, 2000)
+    ]
+    await notifications.send_sms.send_bulk(messages)
     print("Messages dispatched")
 
 
@@ -1,16 +1,26 @@
 import asyncio
 import json
 import time
-from urllib.request import urlopen
+
+import httpx
 
 import ltq
 
-OUTPUT_FILE = "github_repos.json"
+OUTPUT_FILE = "github_repos.ndjson"
 
 worker = ltq.Worker("github")
 
 
 cache = dict()
+client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # shared by all fetches, so connections and TLS sessions are reused
+    global client
+    if client is None:
+        client = httpx.AsyncClient(timeout=10.0)
+    return client
 
 
 def parse(raw_data: dict, owner: str, repo: str) -> None:
@@ -37,20 +47,20 @@ async def fetch(owner: str, repo: str) -> None:
     print(f"Fetching {owner}/{repo}...")
 
     url = f"https://api.github.com/repos/{owner}/{repo}"
-    response = await asyncio.to_thread(
-        urlopen, url, timeout=10.0
-    )  # don't block the event loop
-    data = json.loads(response.read())
+    response = await get_client().get(url)
+    response.raise_for_status()
+    data = response.json()
 
-    await asyncio.to_thread(parse, data, owner, repo)
+    parse(data, owner, repo)
     await store.send(owner, repo)
 
 
 @worker.task()
 async def store(owner: str, repo: str) -> None:
     print(f"Storing {owner}/{repo}...")
-    with open(OUTPUT_FILE, "w") as file:
-        json.dump(cache, file, indent=2)
+    # append one line per repo instead of rewriting the whole file each time
+    with open(OUTPUT_FILE, "a") as file:
+        file.write(json.dumps(cache[repo]) + "\n")
 
 
 async def main() -> None:
@@ -10,11 +10,11 @@ def fib(x):
     return fib(x - 1) + fib(x - 2)
 
 
-@worker.task()
-async def compute(n: int):
-    result = await asyncio.to_thread(
-        fib, n
-    )  # True parallelism in free-threaded Python! (3.14t for example)
+@worker.task(cpu_bound=True)
+def compute(n: int):
+    # runs on the worker's thread pool, true parallelism in
+    # free-threaded Python! (3.14t for example)
+    result = fib(n)
     print(f"fib({n}) = {result}")
     return result
 
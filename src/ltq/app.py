@@ -1,14 +1,23 @@
 import asyncio
 import threading
 
+from .logger import get_logger
 from .middleware import Middleware
+from .utils import run
 from .worker import Worker
 
 
 class App:
-    def __init__(self, middlewares: list[Middleware] | None = None) -> None:
+    def __init__(
+        self,
+        middlewares: list[Middleware] | None = None,
+        supervisor_interval: float = 0.5,
+    ) -> None:
         self.workers: dict[str, Worker] = dict()
         self.middlewares: list[Middleware] = middlewares or []
+        # seconds between liveness checks of isolated worker threads
+        self.supervisor_interval = supervisor_interval
+        self.logger = get_logger("app")
 
     def register_middleware(self, middleware: Middleware, pos: int = -1) -> None:
         if pos == -1:
@@ -24,18 +33,43 @@ class App:
 
     @staticmethod
     def _run_worker(worker: Worker) -> None:
-        asyncio.run(worker.run())
+        run(worker.run())
+
+    async def _run_shared(self, worker: Worker) -> None:
+        # like a worker thread dying on its own: log it, keep the others going
+        try:
+            await worker.run()
+        except Exception:
+            self.logger.exception("Worker %s failed", worker.name)
+
+    async def _watch(self, threads: tuple[threading.Thread, ...]) -> None:
+        alive_checks = tuple(t.is_alive for t in threads)
+        while any(alive() for alive in alive_checks):
+            await asyncio.sleep(self.supervisor_interval)
 
     async def run(self) -> None:
-        threads: list[threading.Thread] = []
-        for worker in self.workers.values():
-            t = threading.Thread(target=self._run_worker, args=(worker,), daemon=True)
+        # workers are not registered while running, work on a snapshot.
+        # isolated workers get their own thread and event loop, the rest
+        # share the loop this coroutine runs on
+        workers = tuple(self.workers.values())
+        shared = tuple(w for w in workers if not w.isolated)
+        threads = tuple(
+            threading.Thread(target=self._run_worker, args=(w,), daemon=True)
+            for w in workers
+            if w.isolated
+        )
+        for t in threads:
             t.start()
-            threads.append(t)
 
+        runs = [asyncio.create_task(self._run_shared(w)) for w in shared]
+        watch = asyncio.create_task(self._watch(threads))
         try:
-            while any(t.is_alive() for t in threads):
-                await asyncio.sleep(0.2)
+            await asyncio.gather(*runs, watch)
         except asyncio.CancelledError:
             # Allow graceful shutdown when the run coroutine is cancelled.
-            pass
+            # gather returns as soon as the watcher is cancelled, while the
+            # shared workers are still draining: wait for them (asyncio.wait
+            # does not cancel them again).
+            watch.cancel()
+            if runs:
+                await asyncio.wait(runs)
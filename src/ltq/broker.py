@@ -4,27 +4,38 @@ import asyncio
 import time
 from urllib.parse import urlparse
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
+from typing import Any
 
 import redis.asyncio as aioredis
 
 from .message import Message
 
+# max members per ZADD in publish_bulk, keeps single commands reasonably sized
+PUBLISH_CHUNK_SIZE = 10_000
+# publish_bulk encodes batches at least this large off the event loop
+ENCODE_OFFLOAD_SIZE = 1_000
+
 
 class Broker:
     @staticmethod
-    def from_url(url: str) -> Broker:
+    def from_url(url: str, **kwargs: Any) -> Broker:
+        # kwargs are RedisBroker options (max_connections, pool_timeout)
         urlp = urlparse(url)
         if urlp.scheme == "memory":
             return MemoryBroker()
         elif urlp.scheme == "redis":
-            return RedisBroker(url)
+            return RedisBroker(url, **kwargs)
         else:
             raise RuntimeError(f"Unknown scheme: {urlp.scheme}")
 
     async def close(self) -> None: ...
     async def publish(self, message: Message, delay: float = 0) -> None: ...
-    async def consume(self, queue: str) -> Message: ...
+    async def publish_bulk(self, messages: list[Message], delay: float = 0) -> None:
+        for message in messages:
+            await self.publish(message, delay=delay)
+
+    async def consume(self, queue: str, batch_size: int = 1) -> Message: ...
     async def ack(self, message: Message) -> None: ...
     async def nack(
         self,
@@ -37,20 +48,82 @@ class Broker:
 
 
 class RedisBroker(Broker):
-    def __init__(self, url: str) -> None:
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 64,
+        pool_timeout: float = 10.0,
+    ) -> None:
         self.url = url
-        self._client = aioredis.from_url(url)
+        # bounded pool: blocking consumes, publishes and acks each check out
+        # their own connection instead of queueing behind one another. A
+        # checkout waiting longer than pool_timeout raises ConnectionError
+        # instead of hanging when the pool is too small. The url's
+        # ?max_connections= and ?timeout= take precedence.
+        self._pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+        )
+        self._client = aioredis.Redis.from_pool(self._pool)
         self._id = uuid.uuid4().hex[:8]
+        self._buffers: defaultdict[str, deque[Message]] = defaultdict(deque)
+        # acked/nacked payloads per queue, removed from processing by the next consume
+        self._settled: defaultdict[str, list[bytes]] = defaultdict(list)
+        # retries waiting to be republished, and the pending flush
+        self._retries: list[tuple[Message, float]] = []
+        self._retry_flush: asyncio.Future[None] | None = None
+        # max seconds an idle consume blocks before re-checking the queue
+        self.block_timeout = 1.0
         self._consume = self._client.register_script("""
-            local ready = redis.call('zrangebyscore', KEYS[1], 0, ARGV[1], 'LIMIT', 0, 1)
-            if #ready == 0 then return nil end
-            local msg = ready[1]
-            redis.call('zadd', KEYS[2], ARGV[1], msg)
-            redis.call('zrem', KEYS[1], msg)
-            return msg
+            -- settle acks/nacks piggybacked on this call (ARGV[3..])
+            for i = 3, #ARGV, 1000 do
+                redis.call('zrem', KEYS[2], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+            end
+            local ready = redis.call('zrangebyscore', KEYS[1], 0, ARGV[1], 'LIMIT', 0, ARGV[2])
+            if #ready == 0 then
+                local head = redis.call('zrange', KEYS[1], 0, 0, 'WITHSCORES')
+                return {ready, head[2] or false}
+            end
+            -- variadic ZADD/ZREM, chunked to stay below Lua's unpack limit
+            for i = 1, #ready, 1000 do
+                local last = math.min(i + 999, #ready)
+                local args = {}
+                for j = i, last do
+                    args[#args + 1] = ARGV[1]
+                    args[#args + 1] = ready[j]
+                end
+                redis.call('zadd', KEYS[2], unpack(args))
+                redis.call('zrem', KEYS[1], unpack(ready, i, last))
+            end
+            -- a full batch means more may be waiting: pass the wake-up on
+            -- so another blocked consumer starts draining too
+            if #ready == tonumber(ARGV[2]) then
+                redis.call('lpush', KEYS[3], 1)
+                redis.call('ltrim', KEYS[3], 0, 0)
+            end
+            return {ready, false}
         """)
 
     async def close(self) -> None:
+        # hand prefetched messages back so they aren't stranded in processing,
+        # one variadic ZREM and ZADD per queue, and settle pending acks/nacks
+        buffered = {
+            queue: [self._stored(m) for m in buffer]
+            for queue, buffer in self._buffers.items()
+            if buffer
+        }
+        settled = {queue: raws for queue, raws in self._settled.items() if raws}
+        self._buffers.clear()
+        self._settled.clear()
+        if buffered or settled:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for queue, raws in settled.items():
+                    pipe.zrem(f"processing:{queue}:{self._id}", *raws)  # type: ignore
+                for queue, raws in buffered.items():
+                    pipe.zrem(f"processing:{queue}:{self._id}", *raws)  # type: ignore
+                    pipe.zadd(f"queue:{queue}", dict.fromkeys(raws, 0))  # type: ignore
+                await pipe.execute()
         await self._client.aclose()
 
     async def publish(
@@ -58,27 +131,80 @@ class RedisBroker(Broker):
         message: Message,
         delay: float = 0,
     ) -> None:
+        await self.publish_bulk([message], delay=delay)
+
+    async def publish_bulk(
+        self,
+        messages: list[Message],
+        delay: float = 0,
+    ) -> None:
+        # wall-clock on purpose: scores are compared by every publisher and
+        # worker host, and monotonic clocks are only meaningful per machine
+        if len(messages) >= ENCODE_OFFLOAD_SIZE:
+            # one thread hop for the whole batch (not per message) encodes
+            # off the event loop, keeping it responsive
+            groups = await asyncio.to_thread(self._group, messages)
+        else:
+            groups = self._group(messages)
         score = time.time() + delay
-        await self._client.zadd(
-            f"queue:{message.task_name}",
-            {
-                message.to_json(): score,
-            },
-        )  # type: ignore
 
-    async def consume(self, queue: str) -> Message:
-        while True:
-            msg = await self._consume(
-                keys=[f"queue:{queue}", f"processing:{queue}:{self._id}"],
-                args=[time.time()],
-            )
-            if msg:
-                return Message.from_json(msg)
-            await asyncio.sleep(0.1)
+        # one ZADD per queue (per chunk), all sent in a single round-trip. The
+        # wake list holds at most one token and unblocks consumers in BLPOP.
+        async with self._client.pipeline(transaction=False) as pipe:
+            for queue, payloads in groups.items():
+                for i in range(0, len(payloads), PUBLISH_CHUNK_SIZE):
+                    chunk = payloads[i : i + PUBLISH_CHUNK_SIZE]
+                    pipe.zadd(f"queue:{queue}", dict.fromkeys(chunk, score))  # type: ignore
+                pipe.lpush(f"wake:{queue}", 1)  # type: ignore
+                pipe.ltrim(f"wake:{queue}", 0, 0)  # type: ignore
+            await pipe.execute()
+
+    @staticmethod
+    def _group(messages: list[Message]) -> dict[str, list[bytes]]:
+        groups: defaultdict[str, list[bytes]] = defaultdict(list)
+        for message in messages:
+            groups[message.task_name].append(message.to_json())
+        return groups
+
+    async def consume(self, queue: str, batch_size: int = 1) -> Message:
+        buffer = self._buffers[queue]
+        while not buffer:
+            now = time.time()
+            settled = self._settled.pop(queue, [])
+            try:
+                msgs, next_at = await self._consume(
+                    keys=[
+                        f"queue:{queue}",
+                        f"processing:{queue}:{self._id}",
+                        f"wake:{queue}",
+                    ],
+                    args=[now, batch_size, *settled],
+                )
+            except BaseException:
+                # not settled, retry with the next call (ZREM is idempotent)
+                self._settled[queue].extend(settled)
+                raise
+            if msgs:
+                buffer.extend(Message.from_json(msg) for msg in msgs)
+                break
+
+            # nothing ready: block server-side until a publish wakes us
+            # or the earliest delayed message becomes due
+            timeout = self.block_timeout
+            if next_at is not None:
+                timeout = min(timeout, max(float(next_at) - now, 0.01))
+            await self._client.blpop([f"wake:{queue}"], timeout=timeout)  # type: ignore
+        return buffer.popleft()
+
+    @staticmethod
+    def _stored(message: Message) -> bytes:
+        # exact bytes held in the processing set, ctx may have changed since
+        return message._raw if message._raw is not None else message.to_json()
 
     async def ack(self, message: Message) -> None:
-        key = f"processing:{message.task_name}:{self._id}"
-        await self._client.zrem(key, message.to_json())  # type: ignore
+        # no round-trip of its own: settled by the next consume of this queue
+        # (also when it finds nothing ready) or on close
+        self._settled[message.task_name].append(self._stored(message))
 
     async def nack(
         self,
@@ -86,21 +212,49 @@ class RedisBroker(Broker):
         delay: float = 0,
         drop: bool = False,
     ) -> None:
-        key = f"processing:{message.task_name}:{self._id}"
-        await self._client.zrem(key, message.to_json())  # type: ignore
-        if not drop:
-            await self.publish(message, delay=delay)
+        # removed from processing together with the acks
+        self._settled[message.task_name].append(self._stored(message))
+        if drop:
+            return
+        # middleware may have changed ctx since to_json() was memoized
+        message._encoded = None
+        # group commit: retries from the same loop iteration share one
+        # pipeline, each nack still returns only once its message is queued
+        self._retries.append((message, time.time() + delay))
+        if self._retry_flush is None:
+            self._retry_flush = asyncio.ensure_future(self._flush_retries())
+        await asyncio.shield(self._retry_flush)
+
+    async def _flush_retries(self) -> None:
+        await asyncio.sleep(0)  # let the rest of this iteration's retries join
+        retries, self._retries = self._retries, []
+        self._retry_flush = None
+        groups: defaultdict[str, dict[bytes, float]] = defaultdict(dict)
+        for message, score in retries:
+            groups[message.task_name][message.to_json()] = score
+        async with self._client.pipeline(transaction=False) as pipe:
+            for queue, members in groups.items():
+                pipe.zadd(f"queue:{queue}", members)  # type: ignore
+                pipe.lpush(f"wake:{queue}", 1)  # type: ignore
+                pipe.ltrim(f"wake:{queue}", 0, 0)  # type: ignore
+            await pipe.execute()
 
     async def len(self, queue: str) -> int:
         return await self._client.zcard(f"queue:{queue}") or 0  # type: ignore
 
     async def clear(self, queue: str) -> None:
-        await self._client.delete(f"queue:{queue}", f"processing:{queue}:{self._id}")  # type: ignore
+        self._settled.pop(queue, None)
+        await self._client.delete(
+            f"queue:{queue}",
+            f"processing:{queue}:{self._id}",
+            f"wake:{queue}",
+        )  # type: ignore
 
 
 class MemoryBroker(Broker):
     def __init__(self) -> None:
-        self._queues: defaultdict[str, dict[str, float]] = defaultdict(dict)
+        self._queues: defaultdict[str, dict[bytes, float]] = defaultdict(dict)
+        self._events: defaultdict[str, asyncio.Event] = defaultdict(asyncio.Event)
 
     async def close(self) -> None:
         pass
@@ -110,16 +264,30 @@ class MemoryBroker(Broker):
         message: Message,
         delay: float = 0,
     ) -> None:
-        self._queues[message.task_name][message.to_json()] = time.time() + delay
+        # single process, so a monotonic clock is safe and immune to NTP steps
+        self._queues[message.task_name][message.to_json()] = time.monotonic() + delay
+        self._events[message.task_name].set()
 
-    async def consume(self, queue: str) -> Message:
+    async def consume(self, queue: str, batch_size: int = 1) -> Message:
+        event = self._events[queue]
         while True:
-            now = time.time()
+            now = time.monotonic()
+            next_at: float | None = None
             for msg, score in list(self._queues[queue].items()):
                 if score <= now:
                     del self._queues[queue][msg]
                     return Message.from_json(msg)
-            await asyncio.sleep(0.1)
+                if next_at is None or score < next_at:
+                    next_at = score
+
+            # sleep until a publish or the earliest delayed message is due
+            event.clear()
+            timeout = None if next_at is None else next_at - now
+            try:
+                async with asyncio.timeout(timeout):
+                    await event.wait()
+            except TimeoutError:
+                pass
 
     async def ack(self, message: Message) -> None:
         pass
@@ -131,6 +299,8 @@ class MemoryBroker(Broker):
         drop: bool = False,
     ) -> None:
         if not drop:
+            # middleware may have changed ctx since to_json() was memoized
+            message._encoded = None
             await self.publish(message, delay=delay)
 
     async def len(self, queue: str) -> int:
@@ -1,6 +1,5 @@
 """CLI for running ltq workers."""
 
-import asyncio
 import importlib
 import sys
 from pathlib import Path
@@ -9,6 +8,7 @@ import argparse
 from .logger import setup_logging, get_logger
 from .app import App
 from .broker import Broker
+from .utils import run
 from .worker import Worker
 
 logger = get_logger()
@@ -46,7 +46,7 @@ async def clear_queue(
     broker = Broker.from_url(url)
     try:
         await broker.clear(task_name)
-        logger.info(f"Cleared queue for task: {task_name}")
+        logger.info("Cleared queue for task: %s", task_name)
     finally:
         await broker.close()
 
@@ -128,12 +128,12 @@ def main():
 
     # Handle clear command
     if args.command == "clear":
-        asyncio.run(clear_queue(args.task_name, args.redis_url))
+        run(clear_queue(args.task_name, args.redis_url))
         return
 
     # Handle size command
     if args.command == "size":
-        size = asyncio.run(get_queue_size(args.task_name, args.redis_url))
+        size = run(get_queue_size(args.task_name, args.redis_url))
         print(f"{args.task_name}: {size}")
         return
 
@@ -154,7 +154,7 @@ def main():
             logger.info("Starting ltq app")
 
             try:
-                asyncio.run(app.run())
+                run(app.run())
             except KeyboardInterrupt:
                 logger.info("Shutting down...")
         else:
@@ -166,7 +166,7 @@ def main():
             logger.info("Starting ltq worker")
 
             try:
-                asyncio.run(worker.run())
+                run(worker.run())
             except KeyboardInterrupt:
                 logger.info("Shutting down...")
         return
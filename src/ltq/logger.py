@@ -1,6 +1,5 @@
 import logging
 import sys
-import threading
 
 
 class ColoredFormatter(logging.Formatter):
@@ -23,21 +22,50 @@ class ColoredFormatter(logging.Formatter):
         logging.CRITICAL: RED,
     }
 
+    def __init__(self, use_color: bool = True) -> None:
+        super().__init__()
+        self.use_color = use_color
+        # colored level and logger names are fixed per record type, build them once
+        self._levels = {
+            level: self._paint(color, f"{logging.getLevelName(level):<4}")
+            for level, color in self.COLORS.items()
+        }
+        self._names: dict[str, str] = {}
+        gray, reset = (self.GRAY, self.RESET) if use_color else ("", "")
+        self._template = f"{gray}%s.%03d{reset} {gray}[%s]{reset} %s %s %s"
+        # (epoch second, formatted) as one tuple so threads never see a torn pair
+        self._second: tuple[int, str] = (-1, "")
+
+    def _paint(self, color: str, text: str) -> str:
+        return f"{color}{text}{self.RESET}" if self.use_color else text
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record with colored severity level."""
-        color = self.COLORS.get(record.levelno, self.RESET)
-        log_time = self.formatTime(record, "%Y-%m-%d %H:%M:%S")
-        log_time_ms = f"{log_time}.{int(record.msecs):03d}"
-        timestamp = f"{self.GRAY}{log_time_ms}{self.RESET}"
-
-        levelname = f"{color}{record.levelname:<4}{self.RESET}"
-
-        name = record.name.removeprefix("ltq.")
-        workername = f"{self.CYAN}{name:<6}{self.RESET}"
-        thread_id = f"{self.GRAY}[{threading.current_thread().ident}]{self.RESET}"
+        levelname = self._levels.get(record.levelno)
+        if levelname is None:
+            levelname = self._paint(self.RESET, f"{record.levelname:<4}")
+
+        workername = self._names.get(record.name)
+        if workername is None:
+            name = record.name.removeprefix("ltq.")
+            workername = self._names[record.name] = self._paint(
+                self.CYAN, f"{name:<6}"
+            )
 
-        message = record.getMessage()
-        log_line = f"{timestamp} {thread_id} {levelname} {workername} {message}"
+        # strftime only once per second
+        second, log_time = self._second
+        if int(record.created) != second:
+            log_time = self.formatTime(record, "%Y-%m-%d %H:%M:%S")
+            self._second = (int(record.created), log_time)
+
+        log_line = self._template % (
+            log_time,
+            record.msecs,
+            record.thread,
+            levelname,
+            workername,
+            record.getMessage(),
+        )
 
         if record.exc_info and not record.exc_text:
             record.exc_text = self.formatException(record.exc_info)
@@ -45,7 +73,7 @@ class ColoredFormatter(logging.Formatter):
         if record.exc_text:
             lines = record.exc_text.split("\n")
             log_line += "\n" + "\n".join(
-                f"  {self.GRAY}{line}{self.RESET}" for line in lines
+                f"  {self._paint(self.GRAY, line)}" for line in lines
             )
 
         return log_line
@@ -58,7 +86,7 @@ def setup_logging(level: int | str = logging.INFO) -> None:
         logger.setLevel(level)
 
         handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(ColoredFormatter())
+        handler.setFormatter(ColoredFormatter(use_color=sys.stdout.isatty()))
         logger.addHandler(handler)
 
         logger.propagate = False
@@ -1,34 +1,104 @@
 from __future__ import annotations
 
 import json
+import os
 import time
-import uuid
 from dataclasses import dataclass, field
 from typing import Any
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+
+# reused instance: json.dumps builds a new encoder whenever options are passed
+_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    # the leading space (valid JSON) marks payloads written by the stdlib
+    # encoder: orjson would read their ints beyond 64 bits back as floats
+    return b" " + _encoder.encode(obj).encode()
+
+
+if orjson is not None:
+
+    def _dumps(obj: Any) -> bytes:
+        # accept what the stdlib encoder accepts: non-str keys are
+        # stringified like json does, anything else falls back to json
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return _json_dumps(obj)
+
+    def _loads(data: bytes) -> Any:
+        if data[:1] == b" ":
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity from stdlib encoders predating the marker
+            return json.loads(data)
+
+else:
+    _dumps = _json_dumps
+    _loads = json.loads
+
+
+# Workers older than the array format can only read the object form: set
+# LTQ_MESSAGE_FORMAT=object on publishers until every worker is upgraded
+_format = os.environ.get("LTQ_MESSAGE_FORMAT", "array").lower()
+if _format not in ("array", "object"):
+    raise RuntimeError(f"Unknown LTQ_MESSAGE_FORMAT: {_format}")
+_object_format = _format == "object"
+
+
 def _default_ctx() -> dict[str, Any]:
     return {"created_at": time.time()}
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     args: tuple[Any, ...]
     kwargs: dict[str, Any]
     task_name: str
     ctx: dict[str, Any] = field(default_factory=_default_ctx)
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
-
-    def to_json(self) -> str:
-        return json.dumps(
-            {
-                "task_name": self.task_name,
-                "id": self.id,
-                "args": self.args,
-                "kwargs": self.kwargs,
-                "ctx": self.ctx,
-            }
-        )
+    id: str = field(default_factory=lambda: os.urandom(16).hex())
+    # memoized to_json() output
+    _encoded: bytes | None = field(default=None, init=False, repr=False, compare=False)
+    # payload as received from the broker, used to ack/nack the stored copy
+    _raw: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    def to_json(self) -> bytes:
+        if self._encoded is None:
+            if _object_format:
+                self._encoded = _dumps(
+                    {
+                        "task_name": self.task_name,
+                        "id": self.id,
+                        "args": self.args,
+                        "kwargs": self.kwargs,
+                        "ctx": self.ctx,
+                    }
+                )
+            else:
+                # positional array, so field names aren't repeated in every payload
+                self._encoded = _dumps(
+                    [self.task_name, self.id, self.args, self.kwargs, self.ctx]
+                )
+        return self._encoded
 
     @classmethod
     def from_json(cls, data: str | bytes) -> Message:
-        return cls(**json.loads(data))
+        raw = data.encode() if isinstance(data, str) else data
+        obj = _loads(raw)
+        if isinstance(obj, dict):
+            # messages enqueued before the array format
+            message = cls(**obj)
+        else:
+            task_name, id, args, kwargs, ctx = obj
+            # positional: skips building a kwargs dict per decoded message
+            message = cls(args, kwargs, task_name, ctx, id)
+        message._raw = raw
+        return message
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
-from functools import lru_cache
 import random
 import time
 from abc import ABC, abstractmethod
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 
 class Middleware(ABC):
+    def applies(self, task: Task) -> bool:
+        # False leaves the middleware out of the task's chain entirely
+        return True
+
     @abstractmethod
     @asynccontextmanager
     async def __call__(self, message: Message, task: Task) -> AsyncIterator[None]:
@@ -39,6 +43,9 @@ class MaxTries(Middleware):
 
 
 class MaxAge(Middleware):
+    def applies(self, task: Task) -> bool:
+        return task.options.get("max_age") is not None
+
     @asynccontextmanager
     async def __call__(self, message: Message, task: Task) -> AsyncIterator[None]:
         max_age: timedelta | None = task.options.get("max_age")
@@ -53,11 +60,18 @@ class MaxAge(Middleware):
 
 
 class MaxRate(Middleware):
-    def __init__(self) -> None:
-        self.last_times: dict[str, float] = {}
-
-    @lru_cache(maxsize=128)
-    def _parse_rate(self, rate: str) -> float:
+    def __init__(self, max_wait: float = 1.0) -> None:
+        # token bucket per task name: (tokens, last refill time)
+        self.buckets: dict[str, tuple[float, float]] = {}
+        # waits up to this long are slept in-process, longer ones are
+        # retried through the broker
+        self.max_wait = max_wait
+
+    def applies(self, task: Task) -> bool:
+        return bool(task.options.get("max_rate"))
+
+    @staticmethod
+    def _parse_rate(rate: str) -> float:
         count, unit = rate.split("/")
         count = float(count)
         unit = unit.strip().lower()
@@ -75,19 +89,26 @@ class MaxRate(Middleware):
     async def __call__(self, message: Message, task: Task) -> AsyncIterator[None]:
         max_rate = task.options.get("max_rate")
         if max_rate:
-            now = time.time()
-            last = self.last_times.get(message.task_name, 0.0)
-            elapsed = now - last
-            rate_per_sec = self._parse_rate(max_rate)
-            interval = 1.0 / rate_per_sec
-
-            if elapsed < interval:
-                base_delay = interval - elapsed
+            now = time.monotonic()
+            # parsed once by Worker.task, parse here for tasks built elsewhere
+            rate_per_sec = task.options.get("_max_rate_per_sec") or self._parse_rate(
+                max_rate
+            )
+            capacity = float(task.options.get("max_burst", 1))
+            tokens, last = self.buckets.get(message.task_name, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate_per_sec)
+            base_delay = (1 - tokens) / rate_per_sec if tokens < 1 else 0.0
+
+            if base_delay > self.max_wait:
                 delay = base_delay * 0.5 + random.uniform(0, base_delay * 0.5)
                 message.ctx["rate_limited"] = True
                 raise RetryError(delay=delay)
 
-            self.last_times[message.task_name] = now
+            # take the token before sleeping; a negative balance reserves a
+            # future slot so concurrent messages queue behind this one
+            self.buckets[message.task_name] = (tokens - 1, now)
+            if base_delay > 0:
+                await asyncio.sleep(base_delay)
         yield
 
 
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
 from .broker import Broker
-from .message import Message
+from .message import Message, _dumps, _object_format
 from .logger import get_logger
+from .utils import run
 
 try:
     from croniter import croniter  # type: ignore
@@ -21,13 +24,46 @@ class ScheduledJob:
     expr: str
     _cron: Any = field(init=False, repr=False)  # croniter instance
     next_run: datetime = field(init=False)
+    # next_run as a unix timestamp, floats compare much faster than datetimes
+    _next_ts: float = field(init=False, repr=False)
+    # encoded payload around the id, args and kwargs never change between runs
+    _head: bytes = field(init=False, repr=False)
+    _body: bytes = field(init=False, repr=False)
 
     def __post_init__(self):
         self._cron = croniter(self.expr, datetime.now())  # type: ignore[misc]
+        msg = self.msg
+        # [task_name, "<id>", args, kwargs, ctx], see Message.to_json. The
+        # first ,"", is the empty id: quotes inside task_name are escaped.
+        template = _dumps([msg.task_name, "", msg.args, msg.kwargs])
+        split = template.index(b',"",') + 2
+        self._head = template[:split]
+        self._body = template[split:-1] + b","
         self.advance()
 
+    def message(self) -> Message:
+        # a fresh message per run: without a new id the zset would fold a run
+        # into the previous one if that is still queued, and a stale
+        # created_at would trip MaxAge
+        msg = self.msg
+        ctx = {**msg.ctx, "created_at": time.time()}
+        run = Message(msg.args, msg.kwargs, msg.task_name, ctx)
+        if _object_format:
+            return run
+        encoded_ctx = _dumps(ctx)
+        run._encoded = self._head + run.id.encode() + self._body + encoded_ctx + b"]"
+        if encoded_ctx[:1] == b" " and self._head[:1] != b" ":
+            # ctx needed the stdlib encoder, mark the whole payload
+            run._encoded = b" " + run._encoded
+        return run
+
     def advance(self) -> None:
         self.next_run = self._cron.get_next(datetime)
+        self._next_ts = self.next_run.timestamp()
+
+    def __lt__(self, other: ScheduledJob) -> bool:
+        # heap order
+        return self._next_ts < other._next_ts
 
 
 class Scheduler:
@@ -38,6 +74,7 @@ class Scheduler:
     ) -> None:
         self.broker = Broker.from_url(broker_url)
         self.poll_interval = poll_interval
+        # heap ordered by next_run, soonest job first
         self.jobs: list[ScheduledJob] = []
         self.logger = get_logger("scheduler")
         self.task: asyncio.Task[None] | None = None
@@ -48,39 +85,58 @@ class Scheduler:
                 "Scheduler requires optional dependency 'croniter'. "
                 "Install with 'ltq[scheduler]'."
             )
-        self.jobs.append(ScheduledJob(msg, expr))
+        heapq.heappush(self.jobs, ScheduledJob(msg, expr))
 
     async def run(self) -> None:
         self.logger.info("Starting scheduler")
         for job in self.jobs:
             self.logger.info(
-                f"{job.msg.task_name} [{job.expr}] next={job.next_run:%H:%M:%S}"
+                "%s [%s] next=%s",
+                job.msg.task_name,
+                job.expr,
+                job.next_run.strftime("%H:%M:%S"),
             )
 
+        jobs = self.jobs
         try:
             while True:
-                now = datetime.now()
-                due = [job for job in self.jobs if now >= job.next_run]
+                now = time.time()
+                due: list[ScheduledJob] = []
+                while jobs and jobs[0]._next_ts <= now:
+                    due.append(heapq.heappop(jobs))
 
+                failed = False
                 if due:
                     try:
+                        # one round-trip for everything due this tick
+                        await self.broker.publish_bulk([job.message() for job in due])
                         for job in due:
-                            await self.broker.publish(job.msg)
                             self.logger.info(
-                                f"Enqueued {job.msg.task_name} scheduled={job.next_run:%H:%M:%S}"
+                                "Enqueued %s scheduled=%s",
+                                job.msg.task_name,
+                                job.next_run.strftime("%H:%M:%S"),
                             )
                             job.advance()
                     except Exception:
                         self.logger.exception("Failed to send scheduled jobs")
                         # Don't advance jobs on failure - they'll retry next poll
-
-                await asyncio.sleep(self.poll_interval)
+                        failed = True
+                    finally:
+                        for job in due:
+                            heapq.heappush(jobs, job)
+
+                # sleep until the soonest job is due, but never longer than
+                # poll_interval so clock adjustments are picked up
+                delay = self.poll_interval
+                if jobs and not failed:
+                    delay = max(0.0, min(delay, jobs[0]._next_ts - time.time()))
+                await asyncio.sleep(delay)
         finally:
             await self.broker.close()
 
     def start(self) -> None:
         try:
-            asyncio.run(self.run())
+            run(self.run())
         except KeyboardInterrupt:
             self.logger.info("Scheduler stopped")
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 from typing import Awaitable, Callable, Generic, ParamSpec, TypeVar
 
 from .broker import Broker
@@ -14,23 +16,39 @@ class Task(Generic[P, R]):
         self,
         broker: Broker,
         name: str,
-        fn: Callable[P, Awaitable[R]],
+        fn: Callable[P, Awaitable[R]] | Callable[P, R],
         options: dict | None = None,
     ) -> None:
+        options = options or {}
+        # cpu_bound tasks run in a thread, everything else is awaited on the
+        # loop: a mismatch would silently skip or break the task body
+        if inspect.iscoroutinefunction(fn):
+            if options.get("cpu_bound"):
+                raise TypeError(
+                    f"Task '{name}': cpu_bound=True requires a regular function, "
+                    "not an async def"
+                )
+        elif not options.get("cpu_bound"):
+            raise TypeError(
+                f"Task '{name}': regular functions must set cpu_bound=True, "
+                "or be declared async def"
+            )
         self.name = name
         self.fn = fn
-        self.options = options or {}
+        self.options = options
         self.broker = broker
 
     def message(self, *args: P.args, **kwargs: P.kwargs) -> Message:
-        return Message(
-            args=args,
-            kwargs=kwargs,
-            task_name=self.name,
-        )
+        # routed by name only, the message holds no reference to the Task
+        return Message(args, kwargs, self.name)
 
     async def send(self, *args: P.args, **kwargs: P.kwargs) -> None:
         await self.broker.publish(self.message(*args, **kwargs))
 
+    async def send_bulk(self, messages: list[Message]) -> None:
+        await self.broker.publish_bulk(messages)
+
     async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
-        return await self.fn(*args, **kwargs)
+        if self.options.get("cpu_bound"):
+            return await asyncio.to_thread(self.fn, *args, **kwargs)  # type: ignore
+        return await self.fn(*args, **kwargs)  # type: ignore
@@ -1 +1,35 @@
+from __future__ import annotations
 
+import asyncio
+import os
+from typing import Any, Coroutine, TypeVar
+
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None
+
+T = TypeVar("T")
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop as selected by LTQ_LOOP (auto, uvloop or asyncio).
+
+    auto (the default) uses uvloop when it is installed.
+    """
+    name = os.environ.get("LTQ_LOOP", "auto").lower()
+    if name == "asyncio" or (name == "auto" and uvloop is None):
+        return asyncio.new_event_loop()
+    if name in ("auto", "uvloop"):
+        if uvloop is None:
+            raise ModuleNotFoundError(
+                "LTQ_LOOP=uvloop requires optional dependency 'uvloop'. "
+                "Install with 'ltq[perf]'."
+            )
+        return uvloop.new_event_loop()
+    raise RuntimeError(f"Unknown LTQ_LOOP: {name}")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on a new event loop."""
+    return asyncio.run(main, loop_factory=new_event_loop)
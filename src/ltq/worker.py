@@ -2,19 +2,52 @@ from __future__ import annotations
 
 import asyncio
 import copy
-from contextlib import AsyncExitStack
+import inspect
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Awaitable, Callable, ParamSpec, TypeVar
 
 from .broker import Broker
 from .errors import RejectError, RetryError
 from .logger import get_logger
 from .message import Message
-from .middleware import DEFAULT, Middleware
+from .middleware import DEFAULT, MaxRate, Middleware
 from .task import Task
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
+Handler = Callable[[Message, Task], Awaitable[None]]
+
+
+class _Slots:
+    # free consumers of one task's pool; only its poller ever waits here
+    __slots__ = ("_released", "free")
+
+    def __init__(self, n: int) -> None:
+        self.free = n
+        self._released = asyncio.Event()
+
+    async def acquire(self) -> None:
+        while not self.free:
+            self._released.clear()
+            await self._released.wait()
+        self.free -= 1
+
+    def release(self) -> None:
+        self.free += 1
+        self._released.set()
+
+
+def _takes_batch_size(consume: Callable[..., object]) -> bool:
+    try:
+        inspect.signature(consume).bind("queue", 1)
+    except TypeError:
+        return False
+    return True
+
 
 class Worker:
     def __init__(
@@ -23,12 +56,23 @@ class Worker:
         broker_url: str = "redis://localhost:6379",
         concurrency: int = 100,
         middlewares: list[Middleware] | None = None,
+        batch_size: int | None = None,
+        isolated: bool = False,
+        max_connections: int = 64,
     ) -> None:
         self.name = name
-        self.broker = Broker.from_url(broker_url)
+        # each task's poll holds a connection while blocked in consume, on
+        # top of those publishing and settling messages
+        self.broker = Broker.from_url(broker_url, max_connections=max_connections)
         self.tasks: list[Task] = []
         self.middlewares: list[Middleware] = middlewares or copy.deepcopy(DEFAULT)
         self.concurrency: int = concurrency
+        # messages fetched per broker round-trip, defaults to concurrency
+        self.batch_size: int | None = batch_size
+        # inside an App, run on a dedicated thread and event loop
+        self.isolated: bool = isolated
+        # runs cpu_bound tasks, created on first use
+        self.executor: ThreadPoolExecutor | None = None
         self.logger = get_logger(name)
 
     def register_middleware(self, middleware: Middleware, pos: int = -1) -> None:
@@ -40,9 +84,13 @@ class Worker:
     def task(
         self,
         **options,
-    ) -> Callable[[Callable[P, Awaitable[R]]], Task[P, R]]:
-        def decorator(fn: Callable[P, Awaitable[R]]) -> Task[P, R]:
-            task_name = f"{self.name}:{fn.__qualname__}"
+    ) -> Callable[[Callable[P, Awaitable[R]] | Callable[P, R]], Task[P, R]]:
+        def decorator(fn: Callable[P, Awaitable[R]] | Callable[P, R]) -> Task[P, R]:
+            # interned: used as the key for queues, buckets and routing
+            task_name = sys.intern(f"{self.name}:{fn.__qualname__}")
+            if isinstance(options.get("max_rate"), str):
+                # parse once here, not on every message (and fail early)
+                options["_max_rate_per_sec"] = MaxRate._parse_rate(options["max_rate"])
             task = Task(
                 name=task_name,
                 fn=fn,
@@ -55,67 +103,154 @@ class Worker:
         return decorator
 
     async def _poll(self, task: Task, broker: Broker) -> None:
-        sem = asyncio.Semaphore(self.concurrency)
-        pending: set[asyncio.Task] = set()
-        self.logger.info(f"Polling for Task {task.name}")
+        # a fixed pool of consumers bounds concurrency, instead of a Task per
+        # message. A slot is taken before fetching, so claimed messages never
+        # wait in the worker for a consumer, and a burst is handed off
+        # without yielding between messages.
+        slots = _Slots(self.concurrency)
+        inbox: asyncio.Queue[Message] = asyncio.Queue()
+        batch_size = self.batch_size or self.concurrency
+        if batch_size > 1 and not _takes_batch_size(broker.consume):
+            # broker written before batching: consume(queue) only
+            batch_size = 1
+        self.logger.info("Polling for Task %s", task.name)
+
+        # middlewares are final once running (App may have prepended some)
+        handler = self._build_handler(task)
+        consumers = [
+            asyncio.create_task(
+                self._consume(task, handler, broker, inbox, slots.release)
+            )
+            for _ in range(self.concurrency)
+        ]
+
+        # hot loop, bind lookups once
+        consume, acquire = broker.consume, slots.acquire
+        put, queue = inbox.put_nowait, task.name
 
         try:
             while True:
-                message = await broker.consume(task.name)
-                # concurrency limiter, without, queue would be drained in one go.
-                await sem.acquire()
-                t = asyncio.create_task(self._process(task, broker, sem, message))
-                pending.add(t)
-                t.add_done_callback(pending.discard)
+                await acquire()
+                # back-pressure: claim no more than can start right away (the
+                # slot just taken plus the free ones), the batch grows with
+                # the number of consumers finishing per round-trip
+                n = min(batch_size, slots.free + 1)
+                put(await (consume(queue, n) if n > 1 else consume(queue)))
         except asyncio.CancelledError:
-            self.logger.info(f"Worker {task.name} cancelled...")
-            if pending:
-                await asyncio.gather(*pending, return_exceptions=True)
+            self.logger.info("Worker %s cancelled...", task.name)
+            # finish what was already handed off, then stop the pool
+            await inbox.join()
             raise
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+
+    async def _consume(
+        self,
+        task: Task,
+        handler: Handler,
+        broker: Broker,
+        inbox: asyncio.Queue[Message],
+        release: Callable[[], None],
+    ) -> None:
+        get, done, process = inbox.get, inbox.task_done, self._process
+        while True:
+            message = await get()
+            try:
+                await process(task, handler, broker, message)
+            except Exception:
+                # ack/nack failed, keep the consumer alive
+                self.logger.exception("Failed to settle message %s", message.id)
+            finally:
+                done()
+                release()
 
     async def _process(
         self,
         task: Task,
+        handler: Handler,
         broker: Broker,
-        sem: asyncio.Semaphore,
         message: Message,
     ) -> None:
+        # %-style args: nothing is formatted unless the record is emitted
+        self.logger.debug("Processing message %s", message.id)
         try:
-            self.logger.debug(f"Processing message {message.id}")
-            try:
-                if message.task_name != task.name:
-                    # This should never happen.
-                    raise RejectError(
-                        f"Message {message.id} for unknown task '{message.task_name}' (expected '{task.name}')"
-                    )
-
-                async with AsyncExitStack() as stack:
-                    for middleware in self.middlewares:
-                        await stack.enter_async_context(middleware(message, task))
-                    await task.fn(*message.args, **message.kwargs)
-
-                await broker.ack(message)
-            except RejectError as e:
-                self.logger.warning(f"Message {message.id} rejected: {e}")
-                await broker.nack(message, drop=True)
-            except RetryError as e:
-                self.logger.debug(f"Retrying in {e.delay}s: {e}")
-                await broker.nack(message, delay=e.delay or 0)
-            except Exception as e:
-                self.logger.error(
-                    f"Rejected after error in {task.name}: {e}",
-                    exc_info=True,
+            if message.task_name != task.name:
+                # This should never happen.
+                raise RejectError(
+                    f"Message {message.id} for unknown task '{message.task_name}' (expected '{task.name}')"
                 )
-                await broker.nack(message, drop=True)
-        finally:
-            sem.release()
+
+            await handler(message, task)
+
+            await broker.ack(message)
+        except RejectError as e:
+            self.logger.warning("Message %s rejected: %s", message.id, e)
+            await broker.nack(message, drop=True)
+        except RetryError as e:
+            self.logger.debug("Retrying in %ss: %s", e.delay, e)
+            await broker.nack(message, delay=e.delay or 0)
+        except Exception as e:
+            self.logger.error(
+                "Rejected after error in %s: %s", task.name, e, exc_info=True
+            )
+            await broker.nack(message, drop=True)
+
+    @staticmethod
+    async def _enter(
+        middleware: Middleware,
+        inner: Handler,
+        message: Message,
+        task: Task,
+    ) -> None:
+        async with middleware(message, task):
+            await inner(message, task)
+
+    def _build_handler(self, task: Task) -> Handler:
+        # fold the task's middlewares around _execute once, first one outermost
+        handler: Handler = self._execute
+        for middleware in reversed(self.middlewares):
+            if middleware.applies(task):
+                handler = partial(self._enter, middleware, handler)
+        return handler
+
+    async def _execute(self, message: Message, task: Task) -> None:
+        if not task.options.get("cpu_bound"):
+            await task.fn(*message.args, **message.kwargs)  # type: ignore
+            return
+
+        if self.executor is None:
+            if getattr(sys, "_is_gil_enabled", lambda: True)():
+                self.logger.warning(
+                    "cpu_bound tasks share the GIL on this build, "
+                    "use a free-threaded Python (e.g. 3.14t) for parallelism"
+                )
+            self.executor = ThreadPoolExecutor(
+                max_workers=os.process_cpu_count(),
+                thread_name_prefix=self.name,
+            )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.executor, partial(task.fn, *message.args, **message.kwargs)
+        )
 
     async def run(self) -> None:
+        polls = [asyncio.create_task(self._poll(t, self.broker)) for t in self.tasks]
         try:
-            await asyncio.gather(
-                *[self._poll(task, self.broker) for task in self.tasks]
-            )
+            await asyncio.gather(*polls)
         except asyncio.CancelledError:
             self.logger.info("Worker shutting down...")
         finally:
+            # gather returns as soon as the first poll is done, the others may
+            # still be draining: stop only those not already cancelling (a
+            # second cancel would interrupt the drain), then wait for all of
+            # them before the broker closes
+            for poll in polls:
+                if not poll.cancelling():
+                    poll.cancel()
+            await asyncio.gather(*polls, return_exceptions=True)
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
             await self.broker.close()
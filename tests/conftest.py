@@ -0,0 +1,41 @@
+import asyncio
+
+import fakeredis
+import pytest
+import redis.asyncio as aioredis
+from fakeredis.aioredis import FakeAsyncRedisConnection
+
+
+@pytest.fixture
+def redis_server(monkeypatch: pytest.MonkeyPatch) -> fakeredis.FakeServer:
+    """Back every RedisBroker pool with one in-process fake Redis server."""
+    server = fakeredis.FakeServer()
+    from_url = aioredis.BlockingConnectionPool.from_url.__func__  # type: ignore[attr-defined]
+
+    def fake_from_url(cls, url, **kwargs):
+        kwargs.update(connection_class=FakeAsyncRedisConnection, server=server)
+        return from_url(cls, url, **kwargs)
+
+    monkeypatch.setattr(
+        aioredis.BlockingConnectionPool, "from_url", classmethod(fake_from_url)
+    )
+    return server
+
+
+async def processing_sizes(server: fakeredis.FakeServer) -> dict[bytes, int]:
+    client = aioredis.Redis(
+        connection_pool=aioredis.ConnectionPool(
+            connection_class=FakeAsyncRedisConnection, server=server
+        )
+    )
+    try:
+        keys = await client.keys("processing:*")
+        return {key: await client.zcard(key) for key in keys}
+    finally:
+        await client.aclose()
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
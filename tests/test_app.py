@@ -0,0 +1,39 @@
+import asyncio
+
+from conftest import processing_sizes, wait_for
+
+import ltq
+
+
+def test_run_drains_shared_workers_when_cancelled(redis_server):
+    # the isolated worker keeps the thread watcher alive; cancelling the
+    # app must still let the shared worker finish what it started
+    isolated = ltq.Worker("isolated", "memory://", isolated=True)
+    shared = ltq.Worker("shared", concurrency=10, middlewares=[])
+    started: list[int] = []
+    completed: list[int] = []
+
+    @isolated.task()
+    async def idle() -> None: ...
+
+    @shared.task()
+    async def slow(i: int) -> None:
+        started.append(i)
+        await asyncio.sleep(0.3)
+        completed.append(i)
+
+    app = ltq.App(supervisor_interval=0.05)
+    app.register_worker(isolated)
+    app.register_worker(shared)
+
+    async def main() -> None:
+        await slow.send_bulk([slow.message(i) for i in range(5)])
+        run = asyncio.create_task(app.run())
+        await wait_for(lambda: len(started) == 5)
+        run.cancel()
+        await run
+
+        assert sorted(completed) == list(range(5))
+        assert not any((await processing_sizes(redis_server)).values())
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+import redis.exceptions
+
+import ltq
+from ltq.broker import RedisBroker
+
+
+def test_worker_sets_pool_size(redis_server):
+    worker = ltq.Worker("pool", max_connections=8)
+    assert worker.broker._pool.max_connections == 8
+
+
+def test_url_options_take_precedence(redis_server):
+    broker = RedisBroker("redis://localhost:6379?max_connections=3&timeout=0.5")
+    assert (broker._pool.max_connections, broker._pool.timeout) == (3, 0.5)
+
+
+def test_exhausted_pool_raises_instead_of_hanging(redis_server):
+    broker = RedisBroker("redis://localhost:6379", max_connections=1, pool_timeout=0.1)
+    worker = ltq.Worker("pool", middlewares=[])
+    worker.broker = broker
+
+    @worker.task()
+    async def noop() -> None: ...
+
+    async def main() -> None:
+        held = await broker._pool.get_connection()
+        try:
+            with pytest.raises(redis.exceptions.ConnectionError):
+                await asyncio.wait_for(noop.send(), timeout=5)
+        finally:
+            await broker._pool.release(held)
+            await broker.close()
+
+    asyncio.run(main())
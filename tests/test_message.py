@@ -0,0 +1,96 @@
+import importlib
+import json
+import math
+import sys
+
+import pytest
+
+import ltq.message
+import ltq.scheduler
+
+
+@pytest.fixture(params=["orjson", "json"])
+def message_module(request, monkeypatch: pytest.MonkeyPatch):
+    """ltq.message as loaded with and without the optional orjson."""
+    if request.param == "json":
+        monkeypatch.setitem(sys.modules, "orjson", None)
+    elif importlib.util.find_spec("orjson") is None:
+        pytest.skip("orjson is not installed")
+    module = importlib.reload(ltq.message)
+    importlib.reload(ltq.scheduler)
+    yield module
+    monkeypatch.undo()
+    importlib.reload(ltq.message)
+    importlib.reload(ltq.scheduler)
+
+
+def roundtrip(module, args, kwargs):
+    message = module.Message(args, kwargs, "w:t")
+    return module.Message.from_json(message.to_json())
+
+
+def test_roundtrip(message_module):
+    decoded = roundtrip(message_module, ("a", 1, 2.5, None), {"k": [True, {"x": 1}]})
+    assert decoded.args == ["a", 1, 2.5, None]
+    assert decoded.kwargs == {"k": [True, {"x": 1}]}
+
+
+def test_non_str_keys_are_stringified(message_module):
+    assert roundtrip(message_module, ({1: "a"},), {}).args == [{"1": "a"}]
+
+
+@pytest.mark.parametrize("value", [2**64, -(2**63) - 1, 10**30])
+def test_ints_beyond_64_bits_are_exact(message_module, value):
+    decoded = roundtrip(message_module, (value,), {})
+    assert decoded.args == [value]
+    assert type(decoded.args[0]) is int
+
+
+def test_non_finite_floats(message_module):
+    decoded = roundtrip(message_module, (math.nan, math.inf), {})
+    if message_module.orjson is None:
+        assert math.isnan(decoded.args[0]) and decoded.args[1] == math.inf
+    else:
+        # orjson has no NaN/Infinity literals, they are sent as null
+        assert decoded.args == [None, None]
+
+
+def test_reads_stdlib_payloads_with_non_finite_floats(message_module):
+    decoded = message_module.Message.from_json(b'["w:t","id",[NaN],{},{}]')
+    assert math.isnan(decoded.args[0])
+
+
+def test_reads_legacy_object_form(message_module):
+    payload = b'{"args":[1],"kwargs":{},"task_name":"w:t","ctx":{},"id":"abc"}'
+    decoded = message_module.Message.from_json(payload)
+    assert (decoded.id, decoded.args, decoded.task_name) == ("abc", [1], "w:t")
+
+
+@pytest.mark.parametrize(
+    "args, ctx",
+    [((1, 'say "hi",""'), {}), ((2**64,), {}), ((1,), {"big": 2**64})],
+)
+def test_scheduled_payloads(message_module, args, ctx):
+    msg = message_module.Message(args, {"k": 1}, 'w:"t"', ctx)
+    run = ltq.scheduler.ScheduledJob(msg, "* * * * *").message()
+    decoded = message_module.Message.from_json(run.to_json())
+    assert (decoded.id, decoded.task_name) == (run.id, 'w:"t"')
+    assert (decoded.args, decoded.kwargs) == (list(args), {"k": 1})
+    assert {k: v for k, v in decoded.ctx.items() if k != "created_at"} == ctx
+
+
+def test_object_format_for_older_workers(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LTQ_MESSAGE_FORMAT", "object")
+    module = importlib.reload(ltq.message)
+    importlib.reload(ltq.scheduler)
+    try:
+        msg = module.Message((1,), {"k": 2}, "w:t")
+        run = ltq.scheduler.ScheduledJob(msg, "* * * * *").message()
+        for message in (msg, run):
+            # what workers before the array format do with a payload
+            legacy = module.Message(**json.loads(message.to_json()))
+            assert (legacy.id, legacy.args, legacy.kwargs) == (message.id, [1], {"k": 2})
+    finally:
+        monkeypatch.undo()
+        importlib.reload(ltq.message)
+        importlib.reload(ltq.scheduler)
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import ltq
+
+
+def test_cpu_bound_requires_a_regular_function():
+    worker = ltq.Worker("cpu", "memory://")
+
+    with pytest.raises(TypeError, match="cpu_bound=True requires"):
+
+        @worker.task(cpu_bound=True)
+        async def fetch() -> None: ...
+
+
+def test_regular_function_requires_cpu_bound():
+    worker = ltq.Worker("cpu", "memory://")
+
+    with pytest.raises(TypeError, match="must set cpu_bound=True"):
+
+        @worker.task()
+        def compute() -> int:
+            return 1
+
+
+def test_task_call_runs_either_kind():
+    worker = ltq.Worker("cpu", "memory://")
+
+    @worker.task(cpu_bound=True)
+    def compute(n: int) -> int:
+        return n * 2
+
+    @worker.task()
+    async def fetch(n: int) -> int:
+        return n + 1
+
+    async def main() -> None:
+        assert await compute(2) == 4
+        assert await fetch(2) == 3
+
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+import asyncio
+
+from conftest import processing_sizes, wait_for
+
+import ltq
+from ltq.broker import MemoryBroker, RedisBroker
+from ltq.message import Message
+
+
+def test_run_drains_in_flight_messages_of_every_task(redis_server):
+    # one idle task finishes cancelling right away, the slow one must still
+    # be allowed to finish its handlers before the broker closes
+    worker = ltq.Worker("two", concurrency=10, middlewares=[])
+    started: list[int] = []
+    completed: list[int] = []
+
+    @worker.task()
+    async def idle() -> None: ...
+
+    @worker.task()
+    async def slow(i: int) -> None:
+        started.append(i)
+        await asyncio.sleep(0.3)
+        completed.append(i)
+
+    async def main() -> None:
+        await slow.send_bulk([slow.message(i) for i in range(5)])
+        run = asyncio.create_task(worker.run())
+        await wait_for(lambda: len(started) == 5)
+        run.cancel()
+        await run
+
+        assert sorted(completed) == list(range(5))
+        assert not any((await processing_sizes(redis_server)).values())
+
+    asyncio.run(main())
+
+
+def test_broker_without_batch_size():
+    # consume() as subclasses declared it before batch_size existed
+    class Unbatched(MemoryBroker):
+        async def consume(self, queue: str) -> Message:
+            return await super().consume(queue)
+
+    worker = ltq.Worker("unbatched", broker_url="memory://", concurrency=4, middlewares=[])
+    worker.broker = Unbatched()
+    completed: list[int] = []
+
+    @worker.task()
+    async def record(i: int) -> None:
+        completed.append(i)
+
+    async def main() -> None:
+        await record.send_bulk([record.message(i) for i in range(10)])
+        run = asyncio.create_task(worker.run())
+        await wait_for(lambda: len(completed) == 10)
+        run.cancel()
+        await run
+
+    asyncio.run(main())
+    assert sorted(completed) == list(range(10))
+
+
+def test_cancel_returns_unstarted_messages(redis_server):
+    # two polls on one worker, only one of them busy: handlers already running
+    # finish, the rest stay queued, and nothing is left claimed in processing
+    worker = ltq.Worker("pool", concurrency=2, middlewares=[])
+    started: list[int] = []
+    completed: list[int] = []
+
+    @worker.task()
+    async def idle() -> None: ...
+
+    @worker.task()
+    async def slow(i: int) -> None:
+        started.append(i)
+        await asyncio.sleep(0.3)
+        completed.append(i)
+
+    async def main() -> None:
+        await slow.send_bulk([slow.message(i) for i in range(6)])
+        run = asyncio.create_task(worker.run())
+        await wait_for(lambda: len(started) == 2)
+        run.cancel()
+        await run
+
+        assert sorted(completed) == sorted(started)
+        assert not any((await processing_sizes(redis_server)).values())
+        broker = RedisBroker("redis://localhost:6379")
+        try:
+            assert await broker.len(slow.name) == 6 - len(completed)
+        finally:
+            await broker.close()
+
+    asyncio.run(main())